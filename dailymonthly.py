@@ -19,79 +19,145 @@
 # ///
 
 import click
+import os
 from pathlib import Path
 from datetime import datetime, date, timedelta
 import shutil
-from typing import Optional
+from typing import NamedTuple, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+import json
 import re
 
-def get_daily_notes(notes_dir: Path, target_month: Optional[str] = None) -> dict[str, list[Path]]:
+# Matches a "# YYYY-MM-DD" date header at the start of a note
+_DATE_HEADER_RE = re.compile(r'^#\s*(\d{4}-\d{2}-\d{2})\s*\n')
+
+def _is_daily(name: str) -> bool:
+    """Return True if name looks like a daily note filename (YYYY-MM-DD.md)."""
+    # isdigit() alone also accepts non-ASCII digits such as '²'
+    return (len(name) == 13 and name.isascii() and name.endswith('.md')
+            and name[4] == '-' and name[7] == '-'
+            and name[:4].isdigit() and name[5:7].isdigit() and name[8:10].isdigit())
+
+def _previous_month(today: date) -> str:
+    """Return the month before today's in YYYY-MM format."""
+    last = today.replace(day=1) - timedelta(days=1)
+    return f"{last.year}-{last.month:02d}"
+
+class DailyNote(NamedTuple):
+    """A daily note file as seen by the os.scandir pass."""
+    name: str
+    path: str
+    mtime_ns: int
+
+def get_daily_notes(notes_dir: Path, target_month: Optional[str] = None, max_month: Optional[str] = None) -> dict[str, list[DailyNote]]:
     """
     Get all daily notes organized by month (YYYY-MM).
     If target_month is specified, only return notes for that month.
+    If max_month is specified, skip notes from any later month.
+    Each note carries the name, path and mtime from its os.scandir entry.
     """
-    daily_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}\.md$')
-
-    notes = {}
-    for file in notes_dir.glob('*.md'):
-        if not daily_pattern.match(file.name):
-            continue
+    notes: dict[str, list[DailyNote]] = {}
+    with os.scandir(notes_dir) as it:
+        for entry in it:
+            if not _is_daily(entry.name) or not entry.is_file(follow_symlinks=False):
+                continue
 
-        month = file.stem[:7]  # YYYY-MM
-        if target_month and month != target_month:
-            continue
+            month = entry.name[:7]  # YYYY-MM
+            if target_month and month != target_month:
+                continue
+            if max_month and month > max_month:
+                continue
 
-        if month not in notes:
-            notes[month] = []
-        notes[month].append(file)
+            notes.setdefault(month, []).append(
+                DailyNote(entry.name, entry.path, entry.stat(follow_symlinks=False).st_mtime_ns))
 
-    return {k: sorted(v) for k, v in notes.items()}
+    for month_notes in notes.values():
+        month_notes.sort()
+    return notes
 
-def merge_month_notes(daily_notes: list[Path], output_file: Path, keep_empty: bool = False, append: bool = False, skip_duplicate_todos: bool = False) -> None:
+def merge_month_notes(daily_notes: list[DailyNote], output_file: Path, keep_empty: bool = False, append: bool = False, skip_duplicate_todos: bool = False) -> None:
     """Merge daily notes into a single monthly note with date headers."""
     if output_file.exists() and not append:
         raise FileExistsError(f"Monthly note {output_file} already exists")
 
-    existing_todos = set()
+    # Todos are tracked by hash to keep the set small for todo-heavy months
+    existing_todos: set[int] = set()
     if skip_duplicate_todos and output_file.exists():
-        with output_file.open('r', encoding='utf-8') as out:
-            for line in out:
-                if line.startswith('- [ ]'):
-                    existing_todos.add(line.strip())
+        for line in output_file.read_bytes().decode('utf-8').splitlines():
+            if line.startswith('- [ ]'):
+                existing_todos.add(hash(line.strip()))
 
-    with output_file.open('a', encoding='utf-8') as out:
+    # Files are read and written in binary mode, skipping the buffered text
+    # layer, but content is decoded so stripping and blank-line checks treat
+    # Unicode whitespace (e.g. NBSP) the same as str does
+    with output_file.open('ab') as out:
         for note in daily_notes:
-            content = note.read_text(encoding='utf-8').strip()
+            with open(note.path, 'rb') as f:
+                content = f.read().decode('utf-8').strip()
             if not keep_empty and not content:
                 # do not roll up empty daily notes into monthly unless --keep-empty set
                 continue
 
-            date_str = note.stem
-            # Remove any existing date headers to avoid duplication
-            content = re.sub(r'^#\s*' + date_str + r'\s*\n', '', content, flags=re.MULTILINE)
+            date_str = note.name[:10]
+            # Remove an existing leading date header to avoid duplication
+            if content.startswith('#'):
+                header = _DATE_HEADER_RE.match(content)
+                if header and header.group(1) == date_str:
+                    content = content[header.end():]
 
-            lines = content.splitlines()
-            filtered_content = []
-            only_duplicate_todos = True
-            for line in lines:
+            # Build each note in one buffer and write it, so only a single
+            # note's output is held in memory at a time
+            buf = [f"# {date_str}\n\n"]
+            has_content = False
+            for line in content.splitlines():
+                stripped = line.strip()
                 if skip_duplicate_todos and line.startswith('- [ ]'):
-                    if line.strip() in existing_todos:
+                    todo_hash = hash(stripped)
+                    if todo_hash in existing_todos:
                         continue
-                    existing_todos.add(line.strip())
-                    only_duplicate_todos = False
-                elif line.strip():
-                    only_duplicate_todos = False
-                filtered_content.append(line)
-
-            # Skip notes that are only duplicate todos and whitespace
-            if not keep_empty and only_duplicate_todos:
-                continue
+                    existing_todos.add(todo_hash)
+                elif not stripped and not has_content:
+                    # Skip initial lines that are blank
+                    continue
+                buf.append(line)
+                buf.append("\n")
+                has_content = True
+
+            if not has_content:
+                # Leading blanks are dropped above, so nothing kept means the note
+                # was only duplicate todos and whitespace
+                if not keep_empty:
+                    continue
+                buf.append("\n")
+            buf.append("\n")
+            out.write("".join(buf).encode('utf-8'))
 
-            out.write(f"# {date_str}\n\n")
-            # Skip initial lines that are blank
-            while filtered_content and not filtered_content[0].strip():
-                filtered_content.pop(0)
-            out.write("\n".join(filtered_content) + "\n\n")
+MAX_MERGE_WORKERS = 8
+
+CACHE_FILENAME = '.dailymonthly_cache.json'
+
+def _notes_signature(daily_notes: list[DailyNote], keep_empty: bool, skip_duplicate_todos: bool) -> list:
+    """
+    Identify a month's merge by its daily notes (count, first and last name, newest
+    mtime in ns) and the options that change what gets written for them.
+    """
+    return [len(daily_notes), daily_notes[0].name, daily_notes[-1].name,
+            max(note.mtime_ns for note in daily_notes), keep_empty, skip_duplicate_todos]
+
+def load_cache(notes_dir: Path) -> dict[str, list]:
+    """Load the month -> signature cache of already merged months, or {} if missing or unreadable."""
+    try:
+        cache = json.loads((notes_dir / CACHE_FILENAME).read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def save_cache(notes_dir: Path, cache: dict[str, list]) -> None:
+    """Atomically write the merged-months cache."""
+    cache_file = notes_dir / CACHE_FILENAME
+    tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+    tmp_file.write_text(json.dumps(cache, sort_keys=True), encoding='utf-8')
+    os.replace(tmp_file, cache_file)
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
@@ -124,7 +190,10 @@ def main(notes_dir: Path, month: Optional[str], days_to_keep: Optional[int], del
 
     Notes are combined chronologically with headers for each day. If a monthly
     summary file already exists (e.g., 2024-01.md), that month is skipped with
-    a warning to prevent accidental overwrites.
+    a warning to prevent accidental overwrites. Months whose daily notes and
+    output options are unchanged since they were last merged are not merged again (tracked in
+    .dailymonthly_cache.json in the notes directory); if any note in a month
+    changes, the whole month is merged again.
 
     If you store notes in iCloud Drive, you can find them in
      "$HOME/Library/Mobile Documents/iCloud~md~obsidian/Documents"
@@ -144,10 +213,12 @@ def main(notes_dir: Path, month: Optional[str], days_to_keep: Optional[int], del
     """
     if days_to_keep is not None:
         cutoff_date = date.today() - timedelta(days=days_to_keep)
-        notes_by_month = get_daily_notes(notes_dir)
-        notes_by_month = get_daily_notes(notes_dir)
-        for month, daily_notes in notes_by_month.items():
-            notes_by_month[month] = [note for note in daily_notes if datetime.strptime(note.stem, '%Y-%m-%d').date() <= cutoff_date]
+        # YYYY-MM-DD names sort the same as dates, so compare them as strings
+        cutoff_str = cutoff_date.isoformat()
+        notes_by_month = {
+            month: [note for note in daily_notes if note.name[:10] <= cutoff_str]
+            for month, daily_notes in get_daily_notes(notes_dir, max_month=cutoff_str[:7]).items()
+        }
     elif month:
         try:
             datetime.strptime(month, '%Y-%m')
@@ -155,33 +226,70 @@ def main(notes_dir: Path, month: Optional[str], days_to_keep: Optional[int], del
         except ValueError:
             raise click.BadParameter('Month must be in YYYY-MM format')
     else:
-        # Default beheavior: process all months up through last month
-        today = date.today()
-        # Get last month in YYYY-MM format
-        last_month = today.replace(day=1) - timedelta(days=1)
-        cutoff_month = f"{last_month.year}-{last_month.month:02d}"
-        notes_by_month = get_daily_notes(notes_dir)
-
-        # Filter out future months and current month
-        notes_by_month = {k: v for k, v in notes_by_month.items() if k <= cutoff_month}
+        # Default beheavior: process all months up through last month,
+        # skipping future months and current month while scanning
+        notes_by_month = get_daily_notes(notes_dir, max_month=_previous_month(date.today()))
 
+    cache = load_cache(notes_dir)
+    pending = []
     for month, daily_notes in notes_by_month.items():
         if not daily_notes:
             click.echo(f"No daily notes found for {month}")
             continue
 
         output_file = notes_dir / f"{month}.md"
-        try:
-            merge_month_notes(daily_notes, output_file, keep_empty, append, skip_duplicate_todos)
-            click.echo(f"Successfully merged {len(daily_notes)} notes for {month}")
+        signature = _notes_signature(daily_notes, keep_empty, skip_duplicate_todos)
+        if cache.get(month) == signature and output_file.exists():
+            # Notes are only ever deleted after a merge that succeeded in this run
+            not_deleted = " (not deleted)" if delete else ""
+            click.echo(f"Skipping {month}: daily notes unchanged since last merge{not_deleted}")
+            continue
+        pending.append((month, daily_notes, output_file, signature))
+
+    if not pending:
+        return
+
+    # Each month reads and writes its own files, so the I/O-bound merges can
+    # overlap; results are reported in month order as they are collected and
+    # notes are only deleted here, once their month's merge has succeeded
+    cache_changed = False
+    failed = False
+    try:
+        with ThreadPoolExecutor(max_workers=min(MAX_MERGE_WORKERS, len(pending))) as executor:
+            futures: list[Future] = [
+                executor.submit(merge_month_notes, daily_notes, output_file, keep_empty=keep_empty,
+                                append=append, skip_duplicate_todos=skip_duplicate_todos)
+                for _, daily_notes, output_file, _ in pending
+            ]
+            for (month, daily_notes, _, signature), future in zip(pending, futures):
+                try:
+                    future.result()
+                except FileExistsError as e:
+                    click.echo(f"Error: {e}", err=True)
+                    continue
+                except Exception as e:
+                    click.echo(f"Error: failed to merge notes for {month}: {e}", err=True)
+                    failed = True
+                    continue
+
+                click.echo(f"Successfully merged {len(daily_notes)} notes for {month}")
+                cache[month] = signature
+                cache_changed = True
 
-            if delete:
-                for note in daily_notes:
-                    note.unlink()
-                click.echo(f"Deleted {len(daily_notes)} daily notes for {month}")
+                if delete:
+                    for note in daily_notes:
+                        os.unlink(note.path)
+                    click.echo(f"Deleted {len(daily_notes)} daily notes for {month}")
+                    del cache[month]
+    finally:
+        if cache_changed:
+            try:
+                save_cache(notes_dir, cache)
+            except OSError as e:
+                click.echo(f"Warning: could not save {CACHE_FILENAME}: {e}", err=True)
 
-        except FileExistsError as e:
-            click.echo(f"Error: {e}", err=True)
+    if failed:
+        click.get_current_context().exit(1)
 
 if __name__ == '__main__':
     main()
@@ -9,7 +9,7 @@
 import pytest
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from dailymonthly import get_daily_notes, merge_month_notes, main
+from dailymonthly import get_daily_notes, merge_month_notes, main, _previous_month
 from click.testing import CliRunner
 from unittest.mock import patch
 from datetime import date
@@ -24,18 +24,32 @@ def test_get_daily_notes():
         (tmpdir_path / "2024-02-01.md").write_text("Next month")
         (tmpdir_path / "invalid.md").write_text("Not a daily note")
         (tmpdir_path / "2024-01-02.zip").write_text("Not a daily note")
+        (tmpdir_path / "2024-01-0x.md").write_text("Not a daily note")
+        (tmpdir_path / "2024-01-031.md").write_text("Not a daily note")
+        (tmpdir_path / "2024-0²-01.md").write_text("Not a daily note")
+        (tmpdir_path / "2024-01-04.md").mkdir()
 
         # Test without month filter
         notes = get_daily_notes(tmpdir_path)
         assert set(notes.keys()) == {"2024-01", "2024-02"}
         assert len(notes["2024-01"]) == 2
         assert len(notes["2024-02"]) == 1
+        assert [note.name for note in notes["2024-01"]] == ["2024-01-01.md", "2024-01-02.md"]
+        assert notes["2024-01"][0].mtime_ns == (tmpdir_path / "2024-01-01.md").stat().st_mtime_ns
 
         # Test with month filter
         notes = get_daily_notes(tmpdir_path, "2024-01")
         assert set(notes.keys()) == {"2024-01"}
         assert len(notes["2024-01"]) == 2
 
+        # Test with max month
+        notes = get_daily_notes(tmpdir_path, max_month="2024-01")
+        assert set(notes.keys()) == {"2024-01"}
+
+def test_previous_month():
+    assert _previous_month(date(2024, 3, 15)) == "2024-02"
+    assert _previous_month(date(2024, 1, 1)) == "2023-12"
+
 def test_merge_month_notes():
     with TemporaryDirectory() as tmpdir:
         tmpdir_path = Path(tmpdir)
@@ -43,8 +57,9 @@ def test_merge_month_notes():
         # Create test daily notes
         (tmpdir_path / "2024-01-01.md").write_text("Day 1 content")
         (tmpdir_path / "2024-01-02.md").write_text("# 2024-01-02\nDay 2 content")
+        (tmpdir_path / "2024-01-03.md").write_text("# 2024-01-03\nDay 3 content\n# 2024-01-03\nMore")
 
-        daily_notes = sorted(tmpdir_path.glob("2024-01-*.md"))
+        daily_notes = get_daily_notes(tmpdir_path)["2024-01"]
         output_file = tmpdir_path / "2024-01.md"
 
         merge_month_notes(daily_notes, output_file, keep_empty=False)
@@ -56,6 +71,36 @@ def test_merge_month_notes():
         assert "Day 2 content" in content
         # Check that date header isn't duplicated
         assert content.count("# 2024-01-02") == 1
+        # Only the leading header is stripped; a later matching header is content
+        assert "# 2024-01-03\n\nDay 3 content\n# 2024-01-03\nMore" in content
+        assert content.count("# 2024-01-03") == 2
+
+def test_merge_month_notes_preserves_utf8():
+    with TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        (tmpdir_path / "2024-01-01.md").write_text("Café ☕ — naïve [[Zürich]]", encoding='utf-8')
+        output_file = tmpdir_path / "2024-01.md"
+
+        merge_month_notes(get_daily_notes(tmpdir_path)["2024-01"], output_file, keep_empty=False)
+
+        content = output_file.read_text(encoding='utf-8')
+        assert "Café ☕ — naïve [[Zürich]]" in content
+
+def test_merge_month_notes_unicode_whitespace():
+    with TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        # NBSP and ideographic spaces count as whitespace, as with str.strip()
+        (tmpdir_path / "2024-01-01.md").write_text("\u00a0\u3000\n\u00a0", encoding='utf-8')
+        (tmpdir_path / "2024-01-02.md").write_text("#\u00a02024-01-02\u00a0\nDay 2 content", encoding='utf-8')
+        output_file = tmpdir_path / "2024-01.md"
+
+        merge_month_notes(get_daily_notes(tmpdir_path)["2024-01"], output_file, keep_empty=False)
+
+        content = output_file.read_text(encoding='utf-8')
+        assert "2024-01-01" not in content
+        assert content == "# 2024-01-02\n\nDay 2 content\n\n"
 
 def test_merge_month_notes_existing_file():
     with TemporaryDirectory() as tmpdir:
@@ -66,7 +111,7 @@ def test_merge_month_notes_existing_file():
         output_file = tmpdir_path / "2024-01.md"
         output_file.write_text("Existing content")
 
-        daily_notes = [tmpdir_path / "2024-01-01.md"]
+        daily_notes = get_daily_notes(tmpdir_path)["2024-01"]
 
         with pytest.raises(FileExistsError):
             merge_month_notes(daily_notes, output_file, keep_empty=False)
@@ -108,7 +153,7 @@ def test_days_to_keep():
         output_file = tmpdir_path / "2024-01.md"
         output_file.write_text("Existing content\n")
 
-        daily_notes = sorted(tmpdir_path.glob("2024-01-*.md"))
+        daily_notes = get_daily_notes(tmpdir_path)["2024-01"]
 
         # Append to the existing monthly note
         merge_month_notes(daily_notes, output_file, keep_empty=False, append=True)
@@ -157,6 +202,36 @@ def test_cli_delete_options():
         assert result.exit_code == 0
         assert len(list(tmpdir_path.glob("2024-01-*.md"))) == 0
 
+def test_merge_failure_reports_each_month():
+    runner = CliRunner()
+    with TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        (tmpdir_path / "2024-01-01.md").write_text("January")
+        (tmpdir_path / "2024-02-01.md").write_text("February")
+        (tmpdir_path / "2024-03-01.md").write_text("March")
+
+        real_merge = merge_month_notes
+        def failing_merge(daily_notes, output_file, *args, **kwargs):
+            if output_file.name == "2024-01.md":
+                raise PermissionError("denied")
+            real_merge(daily_notes, output_file, *args, **kwargs)
+
+        with patch('dailymonthly.merge_month_notes', side_effect=failing_merge), \
+                patch('dailymonthly.date') as mock_date:
+            mock_date.today.return_value = date(2024, 4, 1)
+            result = runner.invoke(main, [str(tmpdir_path), '-rm'])
+
+        assert result.exit_code == 1
+        assert "failed to merge notes for 2024-01: denied" in result.output
+        assert "Successfully merged 1 notes for 2024-02" in result.output
+        assert "Deleted 1 daily notes for 2024-03" in result.output
+        # The failed month's notes are left alone
+        assert (tmpdir_path / "2024-01-01.md").exists()
+        assert not (tmpdir_path / "2024-01.md").exists()
+        assert not (tmpdir_path / "2024-02-01.md").exists()
+        assert (tmpdir_path / ".dailymonthly_cache.json").exists()
+
 def test_skip_duplicate_todos_with_empty_notes():
     runner = CliRunner()
     with TemporaryDirectory() as tmpdir:
@@ -228,6 +303,75 @@ def test_cli_default_behavior():
         # Should not create note for current month
         assert not (tmpdir_path / "2024-03.md").exists()
 
+def test_skip_duplicate_todos_with_append():
+    with TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        (tmpdir_path / "2024-01-02.md").write_text("- [ ] Task 1\n- [ ] Task 2")
+        output_file = tmpdir_path / "2024-01.md"
+        output_file.write_text("# 2024-01-01\n\n- [ ] Task 1\r\n")
+
+        merge_month_notes(get_daily_notes(tmpdir_path)["2024-01"], output_file, keep_empty=False,
+                          append=True, skip_duplicate_todos=True)
+
+        content = output_file.read_text()
+        assert content.count("- [ ] Task 1") == 1
+        assert content.count("- [ ] Task 2") == 1
+
+def test_cache_skips_unchanged_months():
+    runner = CliRunner()
+    with TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        (tmpdir_path / "2024-01-01.md").write_text("Day 1 content")
+
+        result = runner.invoke(main, [str(tmpdir_path), '--month', '2024-01', '--append'])
+        assert result.exit_code == 0
+        assert (tmpdir_path / ".dailymonthly_cache.json").exists()
+
+        # Re-running with unchanged notes must not append them a second time
+        result = runner.invoke(main, [str(tmpdir_path), '--month', '2024-01', '--append'])
+        assert result.exit_code == 0
+        assert "Skipping 2024-01" in result.output
+        assert (tmpdir_path / "2024-01.md").read_text().count("Day 1 content") == 1
+
+        # A changed month is merged again in full, so --append repeats earlier notes
+        (tmpdir_path / "2024-01-02.md").write_text("Day 2 content")
+        result = runner.invoke(main, [str(tmpdir_path), '--month', '2024-01', '--append'])
+        assert result.exit_code == 0
+        content = (tmpdir_path / "2024-01.md").read_text()
+        assert content.count("Day 2 content") == 1
+        assert content.count("Day 1 content") == 2
+
+        # Notes of a skipped month are not deleted, since nothing was merged this run
+        result = runner.invoke(main, [str(tmpdir_path), '--month', '2024-01', '--append', '-rm'])
+        assert result.exit_code == 0
+        assert "Skipping 2024-01" in result.output
+        assert "(not deleted)" in result.output
+        assert len(list(tmpdir_path.glob("2024-01-*.md"))) == 2
+
+        # Different output options are not treated as the same merge
+        result = runner.invoke(main, [str(tmpdir_path), '--month', '2024-01', '--append', '--keep-empty'])
+        assert result.exit_code == 0
+        assert "Skipping 2024-01" not in result.output
+        assert (tmpdir_path / "2024-01.md").read_text().count("Day 1 content") == 3
+        result = runner.invoke(main, [str(tmpdir_path), '--month', '2024-01', '--append', '--keep-empty'])
+        assert "Skipping 2024-01" in result.output
+
+def test_cache_save_failure_warns():
+    runner = CliRunner()
+    with TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        (tmpdir_path / "2024-01-01.md").write_text("Day 1 content")
+
+        with patch('dailymonthly.save_cache', side_effect=PermissionError("read-only")):
+            result = runner.invoke(main, [str(tmpdir_path), '--month', '2024-01'])
+
+        assert result.exit_code == 0
+        assert "Successfully merged 1 notes for 2024-01" in result.output
+        assert "Warning: could not save .dailymonthly_cache.json: read-only" in result.output
+
 def test_no_duplicate_content():
     with TemporaryDirectory() as tmpdir:
         tmpdir_path = Path(tmpdir)
@@ -236,7 +380,7 @@ def test_no_duplicate_content():
         (tmpdir_path / "2024-01-01.md").write_text("Day 1 content")
         (tmpdir_path / "2024-01-02.md").write_text("Day 2 content")
 
-        daily_notes = sorted(tmpdir_path.glob("2024-01-*.md"))
+        daily_notes = get_daily_notes(tmpdir_path)["2024-01"]
         output_file = tmpdir_path / "2024-01.md"
 
         merge_month_notes(daily_notes, output_file, keep_empty=False)
@@ -272,7 +416,7 @@ def test_skip_duplicate_todos():
         (tmpdir_path / "2024-01-01.md").write_text("Day 1 content")
         (tmpdir_path / "2024-01-02.md").write_text("- [ ] Task 1\nDay 2 content")
 
-        daily_notes = sorted(tmpdir_path.glob("2024-01-*.md"))
+        daily_notes = get_daily_notes(tmpdir_path)["2024-01"]
         output_file = tmpdir_path / "2024-01.md"
 
         merge_month_notes(daily_notes, output_file, keep_empty=False)